@@ -7,32 +7,18 @@
 from flask import Flask, request, render_template, redirect, url_for, send_from_directory
 from flask import Flask, request, Response, render_template
 import requests
-import random
-import logging
-from logging.handlers import RotatingFileHandler
-import sqlite3
 import os
 import urllib.parse
 import mimetypes
+from proxy_core import choose_proxy, get_proxies, setup_logging, start_proxy_refresh
 
 app = Flask(__name__)
 
-# List of public proxies (update with your own list)
-proxies = [
-    "http://127.0.0.1:8888"
-]
-
 # Setup logging
-handler = RotatingFileHandler('logs/access.log', maxBytes=10000, backupCount=1)
-handler.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-app.logger.addHandler(handler)
+setup_logging(app.logger)
 
-error_handler = RotatingFileHandler('logs/error.log', maxBytes=10000, backupCount=1)
-error_handler.setLevel(logging.ERROR)
-error_handler.setFormatter(formatter)
-app.logger.addHandler(error_handler)
+# Load the working proxies from the database and keep them up to date
+start_proxy_refresh()
 
 
 # Directory to save downloaded files
@@ -42,25 +28,26 @@ if not os.path.exists(DOWNLOAD_FOLDER):
 
 app.config['DOWNLOAD_FOLDER'] = DOWNLOAD_FOLDER
 
+# Response headers that must not be copied from the upstream response.
+# content-encoding/content-length no longer match because requests has
+# already decoded the body; the rest are hop-by-hop headers.
+EXCLUDED_HEADERS = frozenset({
+    'content-encoding',
+    'content-length',
+    'transfer-encoding',
+    'connection',
+    'keep-alive',
+    'proxy-authenticate',
+    'proxy-authorization',
+    'te',
+    'trailers',
+    'upgrade',
+})
 
-def get_proxies():
-    # Connect to the SQLite database
-    conn = sqlite3.connect('proxies/db/working_proxies.db')
-    cursor = conn.cursor()
-
-    # Execute the query to get all proxies
-    cursor.execute('SELECT * FROM proxies')
-    proxies = cursor.fetchall()
-
-    # Close the connection
-    conn.close()
-
-    return proxies
 
 # Home screen route
 @app.route('/')
 def home():
-    proxies = get_proxies()
     return render_template('index.html')
 
 
@@ -121,7 +108,7 @@ def proxy():
     Forwards requests through a randomly chosen proxy server.
     
     This endpoint handles both GET and POST requests. It selects a random proxy from the
-    predefined list and forwards the request to the target server through that proxy.
+    working proxies database and forwards the request to the target server through that proxy.
     
     Returns:
         Response: The response from the target server, including content and headers.
@@ -132,33 +119,32 @@ def proxy():
         if not target_url:
             return Response("Missing 'url' parameter.", status=400)
 
-        # Choose a random proxy from the list
-        selected_proxy = random.choice(proxies)
-        if not selected_proxy:
-            return Response("No proxies available.", status=500)
+        # Choose a random proxy from the pool
+        try:
+            selected_proxy = choose_proxy()
+        except IndexError:
+            return Response("No proxies available.", status=503)
 
         proxies_dict = {
             "http": selected_proxy,
             "https": selected_proxy,
         }
 
-        print(proxies_dict)
-
         # Log the request
-        app.logger.info(f"Received {request.method} request for {target_url} using proxy {selected_proxy}")
+        app.logger.info("Received %s request for %s using proxy %s", request.method, target_url, selected_proxy)
 
         # Forward the request to the target server
         try:
             if request.method == 'POST':
                 response = requests.post(target_url, data=request.form, proxies=proxies_dict, timeout=20)
             else:
-                response = requests.get(target_url, params=request.args, timeout=20)
+                response = requests.get(target_url, params=request.args, proxies=proxies_dict, timeout=20)
 
             # Log the response
-            app.logger.info(f"Response status code: {response.status_code}")
+            app.logger.info("Response status code: %s", response.status_code)
 
             # Copy headers from the target response to the proxy response
-            headers = {key: value for key, value in response.headers.items() if key.lower() != 'content-encoding'}
+            headers = [(key, value) for key, value in response.raw.headers.items() if key.lower() not in EXCLUDED_HEADERS]
 
             # Return the response from the target server
             return Response(response.content, status=response.status_code, headers=headers)
@@ -170,12 +156,13 @@ def proxy():
             app.logger.error("Connection error occurred")
             return Response("A connection error occurred. Please try again later.", status=502)
         except requests.exceptions.RequestException as e:
-            app.logger.error(f"An error occurred: {e}")
+            app.logger.error("An error occurred: %s", e)
             return Response("An error occurred while processing your request.", status=500)
 
     except Exception as e:
-        app.logger.error(f"Error processing request: {e}")
+        app.logger.error("Error processing request: %s", e)
         return Response("An error occurred while processing your request.", status=500)
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Development server only; use gunicorn (see gunicorn_conf.py) in production
+    app.run()
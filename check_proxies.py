@@ -2,10 +2,14 @@ import requests
 import json
 import sqlite3
 import csv
+import logging
+from logging.handlers import RotatingFileHandler
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
-import socks
+import errno
+import selectors
 import socket
+import time
 
 # Paths to the JSON, SQL, and CSV files
 json_file_path = 'proxies/proxy_list.json'
@@ -15,6 +19,16 @@ csv_file_path = 'proxies/db/working_proxies.csv'
 # List to store working proxies
 working_proxies = []
 
+# Number of proxies probed over HTTP at the same time
+MAX_WORKERS = 256
+
+# Set up logging; the log file is rotated once it reaches 10 MB
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+file_handler = RotatingFileHandler('logs/check_proxies.log', maxBytes=10 * 1024 * 1024, backupCount=5)
+file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+logger.addHandler(file_handler)
+
 # Update test URLs for SOCKS proxies
 test_urls = {
     "http": "http://www.example.com",
@@ -23,28 +37,85 @@ test_urls = {
     "socks5": "http://www.example.com"
 }
 
+def filter_reachable(proxies, timeout=1.0, batch_size=512):
+    """
+    Returns the proxies that accept a TCP connection.
+
+    Most dead proxies fail here, which is much cheaper than an HTTP probe.
+    Connections are opened non-blocking, batch_size at a time, and all of
+    them are waited on with a single selector.
+    """
+    reachable = []
+    for start in range(0, len(proxies), batch_size):
+        selector = selectors.DefaultSelector()
+        for proxy in proxies[start:start + batch_size]:
+            try:
+                address = (proxy['IP Address'], int(proxy['Port']))
+            except ValueError:
+                continue
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            try:
+                result = sock.connect_ex(address)
+            except OSError:
+                result = None
+            if result not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                sock.close()
+                continue
+            selector.register(sock, selectors.EVENT_WRITE, proxy)
+
+        # A socket becomes writable once its connect attempt has finished
+        deadline = time.monotonic() + timeout
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in selector.select(remaining):
+                if key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    reachable.append(key.data)
+                selector.unregister(key.fileobj)
+                key.fileobj.close()
+
+        # Whatever is left timed out
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+
+    logger.info("%d of %d proxies accepted a connection", len(reachable), len(proxies))
+    return reachable
+
 def check_proxy(proxy):
     proxy_type = proxy['Type'].lower()
     proxy_address = f"{proxy_type}://{proxy['IP Address']}:{proxy['Port']}"
+
+    # requests handles socks4:// and socks5:// proxy URLs itself (requests[socks])
+    proxies_dict = {"http": proxy_address, "https": proxy_address}
     
-    # For SOCKS proxies, use the SOCKS library
-    if proxy_type in ["socks4", "socks5"]:
-        socks.set_default_proxy(socks.SOCKS4 if proxy_type == "socks4" else socks.SOCKS5, proxy['IP Address'], int(proxy['Port']))
-        socket.socket = socks.socksocket
-    
-    proxies_dict = {proxy_type: proxy_address}
-    
+    test_url = test_urls.get(proxy_type, "http://www.example.com")
+
     try:
-        response = requests.get(test_urls.get(proxy_type, "http://www.example.com"), proxies=proxies_dict, timeout=5)
-        if response.status_code == 200:
-            print(f"Proxy {proxy_address} is alive")
+        # Only the status line matters, so ask for headers instead of the whole page
+        # Responses are streamed and closed on exit, so no body is ever read
+        with requests.head(test_url, proxies=proxies_dict, timeout=3, stream=True, allow_redirects=False) as response:
+            status_code = response.status_code
+        if status_code in (405, 501):
+            # HEAD not supported upstream; fetch a single byte instead
+            with requests.get(test_url, headers={'Range': 'bytes=0-0'}, proxies=proxies_dict, timeout=3,
+                              stream=True, allow_redirects=False) as response:
+                status_code = response.status_code
+        if 200 <= status_code < 400:
+            logger.info("Proxy %s is alive", proxy_address)
             return proxy_address
     except requests.RequestException as e:
-        print(f"Proxy {proxy_address} failed: {e}")
+        logger.debug("Proxy %s failed: %s", proxy_address, e)
     return None
 
 def find_working_proxies(proxies):
-    with ThreadPoolExecutor(max_workers=10) as executor:
+    # Drop proxies that don't accept connections before doing any HTTP work
+    proxies = filter_reachable(proxies)
+
+    # The probes spend nearly all their time waiting on the network, so many threads can run at once
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
         future_to_proxy = {executor.submit(check_proxy, proxy): proxy for proxy in proxies}
         for future in as_completed(future_to_proxy):
             proxy = future_to_proxy[future]
@@ -66,12 +137,18 @@ def save_to_sql(proxies):
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS proxies (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            proxy TEXT NOT NULL
+            proxy TEXT NOT NULL UNIQUE
         )
     ''')
 
-    # Insert working proxies into the table
-    cursor.executemany('INSERT INTO proxies (proxy) VALUES (?)', [(proxy,) for proxy in proxies])
+    # Databases created before the UNIQUE constraint have no unique index and
+    # may hold duplicates; keep the oldest row of each and add the index once
+    if not any(index[2] for index in cursor.execute('PRAGMA index_list(proxies)').fetchall()):
+        cursor.execute('DELETE FROM proxies WHERE id NOT IN (SELECT MIN(id) FROM proxies GROUP BY proxy)')
+        cursor.execute('CREATE UNIQUE INDEX idx_proxies_proxy ON proxies (proxy)')
+
+    # Insert working proxies into the table, skipping ones already stored
+    cursor.executemany('INSERT OR IGNORE INTO proxies (proxy) VALUES (?)', [(proxy,) for proxy in proxies])
 
     conn.commit()
     conn.close()
@@ -83,8 +160,7 @@ def save_to_csv(proxies):
     with open(csv_file_path, 'w', newline='') as csvfile:
         csvwriter = csv.writer(csvfile)
         csvwriter.writerow(['Proxy'])
-        for proxy in proxies:
-            csvwriter.writerow([proxy])
+        csvwriter.writerows((proxy,) for proxy in proxies)
     print(f"Working proxies have been written to {csv_file_path}")
 
 if __name__ == "__main__":
@@ -21,13 +21,12 @@ logging.basicConfig(
 def delete_files(file_paths):
     for file_path in file_paths:
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                logging.info(f"Deleted {file_path}")
-                print(f"Deleted {file_path}")
-            else:
-                logging.warning(f"File not found: {file_path}")
-                print(f"File not found: {file_path}")
+            os.remove(file_path)
+            logging.info(f"Deleted {file_path}")
+            print(f"Deleted {file_path}")
+        except FileNotFoundError:
+            logging.warning(f"File not found: {file_path}")
+            print(f"File not found: {file_path}")
         except Exception as e:
             logging.error(f"Error deleting {file_path}: {e}")
             print(f"Error deleting {file_path}: {e}")
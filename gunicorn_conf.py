@@ -0,0 +1,30 @@
+# AnonyNet Proxy Server
+# Author: MD. SABBIR HOSHEN HOOWLADER
+# Website: https://sabbir28.github.io/
+# License: MIT License
+# Description: Gunicorn settings for running the AnonyNet web server in production.
+#
+# Usage: gunicorn -c gunicorn_conf.py app:app
+import multiprocessing
+import os
+
+# /proxy is an open relay, so only listen locally unless told otherwise,
+# e.g. ANONYNET_BIND=0.0.0.0:5000 behind a firewall or reverse proxy
+bind = os.environ.get('ANONYNET_BIND', '127.0.0.1:5000')
+
+# One process per core (plus spare), each with a pool of threads so that
+# requests waiting on slow upstream proxies don't block the worker
+workers = 2 * multiprocessing.cpu_count() + 1
+worker_class = 'gthread'
+threads = 8
+
+# Keep client connections open between requests
+keepalive = 30
+
+# Upstream proxies can be slow; /proxy itself gives up after 20 seconds
+timeout = 60
+
+# All workers append to the same logs/access.log and logs/error.log, which
+# they can't safely rotate themselves; the app reopens them instead once an
+# external tool (e.g. logrotate) has moved them
+raw_env = ['ANONYNET_EXTERNAL_LOG_ROTATION=1']
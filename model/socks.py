@@ -55,9 +55,10 @@ def send_requests_with_proxies(csv_file_path, url):
     return responses
 
 # Example usage:
-csv_file_path = 'proxies/db/working_proxies.csv'
-url = 'http://example.com'
-responses = send_requests_with_proxies(csv_file_path, url)
+if __name__ == "__main__":
+    csv_file_path = 'proxies/db/working_proxies.csv'
+    url = 'http://example.com'
+    responses = send_requests_with_proxies(csv_file_path, url)
 
-for proxy, status, content in responses:
-    print(f"Proxy: {proxy}, Status: {status}, Content: {content[:100]}")  # Print the first 100 characters of the content
+    for proxy, status, content in responses:
+        print(f"Proxy: {proxy}, Status: {status}, Content: {content[:100]}")  # Print the first 100 characters of the content
@@ -1,61 +1,56 @@
+import asyncio
 import csv
-import httpx
-import socks
-import socket
+import ssl
+from collections import Counter
 
-def setup_socks_proxy(proxy_url):
-    proxy_parts = proxy_url.split('://')
-    scheme = proxy_parts[0]
-    host, port = proxy_parts[1].split(':')
-    port = int(port)
+import certifi
+import httpx
 
-    if scheme == 'socks4':
-        socks.set_default_proxy(socks.SOCKS4, host, port)
-    elif scheme == 'socks5':
-        socks.set_default_proxy(socks.SOCKS5, host, port)
-    else:
-        raise ValueError(f"Unsupported SOCKS scheme: {scheme}")
+# Maximum number of proxies tested at the same time
+MAX_CONCURRENT_REQUESTS = 200
 
-    socket.socket = socks.socksocket
+# Loading the CA bundle is expensive, so every client shares one TLS context
+SSL_CONTEXT = ssl.create_default_context(cafile=certifi.where())
 
-def send_requests_with_proxies(csv_file_path, url):
+async def send_requests(proxy, url, count, semaphore):
+    # One client per proxy, reused for every CSV row that lists it; nothing process-wide is patched
     responses = []
+    async with semaphore:
+        try:
+            async with httpx.AsyncClient(proxy=proxy, timeout=10, verify=SSL_CONTEXT,
+                                         limits=httpx.Limits(max_keepalive_connections=1)) as client:
+                for _ in range(count):
+                    try:
+                        response = await client.get(url)
+                        responses.append((proxy, response.status_code, response.text))
+                    except httpx.RequestError as e:
+                        responses.append((proxy, None, str(e)))
+        except ValueError as e:
+            # Raised for proxy schemes httpx doesn't support (e.g. socks4)
+            responses.extend([(proxy, None, str(e))] * count)
+    return responses
 
+async def send_requests_async(csv_file_path, url):
     with open(csv_file_path, mode='r') as file:
         reader = csv.reader(file)
         next(reader)  # Skip header
 
-        for row in reader:
-            proxy = row[0]
-
-            if proxy.startswith('socks4://') or proxy.startswith('socks5://'):
-                setup_socks_proxy(proxy)
-                proxies = {
-                    'http://': proxy,
-                    'https://': proxy
-                }
-                try:
-                    response = httpx.get(url, timeout=10, proxies=proxies)
-                    responses.append((proxy, response.status_code, response.text))
-                except httpx.RequestError as e:
-                    responses.append((proxy, None, str(e)))
-            else:
-                proxies = {
-                    'http://': proxy,
-                    'https://': proxy
-                }
-                try:
-                    response = httpx.get(url, timeout=10, proxies=proxies)
-                    responses.append((proxy, response.status_code, response.text))
-                except httpx.RequestError as e:
-                    responses.append((proxy, None, str(e)))
-    
-    return responses
+        # Number of rows per proxy, in the order the proxies first appear
+        proxy_counts = Counter(row[0] for row in reader)
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    results = await asyncio.gather(*(send_requests(proxy, url, count, semaphore)
+                                     for proxy, count in proxy_counts.items()))
+    return [response for responses in results for response in responses]
+
+def send_requests_with_proxies(csv_file_path, url):
+    return asyncio.run(send_requests_async(csv_file_path, url))
 
 # Example usage:
-csv_file_path = 'proxies/db/working_proxies.csv'
-url = 'http://example.com'
-responses = send_requests_with_proxies(csv_file_path, url)
+if __name__ == "__main__":
+    csv_file_path = 'proxies/db/working_proxies.csv'
+    url = 'http://example.com'
+    responses = send_requests_with_proxies(csv_file_path, url)
 
-for proxy, status, content in responses:
-    print(f"Proxy: {proxy}, Status: {status}, Content: {content[:100]}")  # Print the first 100 characters of the content
+    for proxy, status, content in responses:
+        print(f"Proxy: {proxy}, Status: {status}, Content: {content[:100]}")  # Print the first 100 characters of the content
@@ -0,0 +1,152 @@
+# AnonyNet Proxy Server
+# Author: MD. SABBIR HOSHEN HOOWLADER
+# Website: https://sabbir28.github.io/
+# License: MIT License
+# Description: Shared helpers for the AnonyNet web server: proxy database access, proxy rotation and logging setup.
+import logging
+from logging.handlers import RotatingFileHandler, WatchedFileHandler
+import os
+import random
+import sqlite3
+import threading
+import time
+
+# Path to the database written by check_proxies.py
+DB_PATH = 'proxies/db/working_proxies.db'
+
+# How often the in-memory proxy pool is reloaded from the database
+PROXY_REFRESH_INTERVAL = 60  # seconds
+
+# Log rotation settings
+LOG_MAX_BYTES = 10 * 1024 * 1024  # 10 MB per log file
+LOG_BACKUP_COUNT = 5
+
+# Set when several processes share the log files (gunicorn_conf.py sets it);
+# RotatingFileHandler isn't safe across processes, so rotation is then left
+# to an external tool such as logrotate
+EXTERNAL_LOG_ROTATION = os.environ.get('ANONYNET_EXTERNAL_LOG_ROTATION') == '1'
+
+
+class SizeRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that only checks the file on disk when a record
+    would actually push the log past maxBytes.
+
+    The stock shouldRollover stats the log file on every record; here the
+    current stream position is checked first and the stat is skipped
+    while the file is still well below the limit.
+    """
+
+    def shouldRollover(self, record):
+        if self.stream is not None and self.maxBytes > 0:
+            msg = "%s\n" % self.format(record)
+            if self.stream.tell() + len(msg) < self.maxBytes:
+                return False
+        return super().shouldRollover(record)
+
+
+def setup_logging(logger):
+    """
+    Attaches the access and error log handlers to the given logger.
+
+    The logs rotate themselves at LOG_MAX_BYTES unless EXTERNAL_LOG_ROTATION
+    is set, in which case they are reopened after an external tool moves
+    them. Calling this more than once (e.g. when the app module is
+    re-imported) does not add a second set of handlers.
+
+    Parameters:
+        logger (logging.Logger): The logger to configure.
+    """
+    if any(isinstance(h, (SizeRotatingFileHandler, WatchedFileHandler)) for h in logger.handlers):
+        return
+
+    def file_handler(path):
+        if EXTERNAL_LOG_ROTATION:
+            return WatchedFileHandler(path)
+        return SizeRotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+
+    handler = file_handler('logs/access.log')
+    handler.setLevel(logging.INFO)
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+    error_handler = file_handler('logs/error.log')
+    error_handler.setLevel(logging.ERROR)
+    error_handler.setFormatter(formatter)
+    logger.addHandler(error_handler)
+
+    logger.setLevel(logging.INFO)
+
+
+def get_proxies():
+    """
+    Reads the working proxies from the SQLite database.
+
+    Returns:
+        list: Proxy addresses, e.g. "http://1.2.3.4:8080".
+    """
+    # Connect to the SQLite database
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    # Execute the query to get all proxies; only the proxy address is used
+    cursor.execute('SELECT proxy FROM proxies')
+    proxies = [row[0] for row in cursor.fetchall()]
+
+    # Close the connection
+    conn.close()
+
+    return proxies
+
+
+# Proxies currently in rotation; replaced as a whole on every reload
+_proxy_pool = ()
+
+
+def load_proxy_pool():
+    """
+    Reloads the in-memory proxy pool from the database.
+
+    If the database can't be read the previous pool is kept.
+
+    Returns:
+        tuple: The proxies now in rotation.
+    """
+    global _proxy_pool
+    try:
+        _proxy_pool = tuple(get_proxies())
+    except sqlite3.Error as e:
+        logging.getLogger(__name__).error("Could not load proxies from %s: %s", DB_PATH, e)
+    return _proxy_pool
+
+
+def start_proxy_refresh(interval=PROXY_REFRESH_INTERVAL):
+    """
+    Loads the proxy pool and keeps reloading it in a background thread.
+
+    Parameters:
+        interval (int): Seconds between reloads.
+    """
+    load_proxy_pool()
+
+    def refresh():
+        while True:
+            time.sleep(interval)
+            load_proxy_pool()
+
+    threading.Thread(target=refresh, name='proxy-refresh', daemon=True).start()
+
+
+def choose_proxy():
+    """
+    Picks a random proxy from the pool.
+
+    Returns:
+        str: The selected proxy address.
+
+    Raises:
+        IndexError: If the pool is empty.
+    """
+    return random.choice(_proxy_pool)
@@ -5,20 +5,179 @@
 # Description: AnonyNet is a proxy server designed to anonymize user requests by routing them through random public proxies. 
 # It aims to enhance privacy and security while browsing by masking the user's IP address and encrypting data.
 
+import re
 import socket
-import threading
 import select
 import signal
 import sys
+import os
+import threading
+import time
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
 
 # Configuration
 LISTENING_ADDR = '0.0.0.0'  # The address on which the proxy server listens
 LISTENING_PORT = 8888  # The port on which the proxy server listens
-BUFFER_SIZE = 5242880  # Maximum amount of data to be sent/received in one go (5 MB)
+BUFFER_SIZE = 65536  # Maximum amount of data to be sent/received in one go (64 KB)
+WORKER_PROCESSES = os.cpu_count() or 1  # Number of server processes sharing the listening port
+MAX_CLIENT_THREADS = 256  # Maximum number of clients handled at once by each server process
+MAX_HEADER_SIZE = 16384  # Maximum size of a request line plus headers (16 KB)
+PIPE_SIZE = 1048576  # Requested capacity of the pipe used to splice tunnel data (1 MB)
+DNS_CACHE_TTL = 300  # Number of seconds a resolved web server address is reused
+DNS_CACHE_SIZE = 4096  # Maximum number of web server addresses kept in the cache
+CLIENT_TIMEOUT = 30  # Number of seconds a client gets to send all of its request headers
+CONNECT_TIMEOUT = 10  # Number of seconds allowed for connecting to a web server
+IDLE_TIMEOUT = 120  # Number of seconds a relayed connection may go without any data before it is closed
+
+# On Linux, tunnel data is moved with splice() so it never gets copied into Python
+USE_SPLICE = hasattr(os, 'splice') and fcntl is not None
+
+# Server details returned for requests to /info
+SERVER_INFO = (
+    "AnonyNet Proxy Server\n"
+    "----------------------\n"
+    "Author: MD. SABBIR HOSHEN HOOWLADER\n"
+    "Website: https://sabbir28.github.io/\n"
+    "License: MIT License\n"
+    "Description: AnonyNet anonymizes user requests by routing them through random public proxies.\n"
+    "Server Name: AnonyNet\n"
+    "Functionalities: HTTP/HTTPS proxy, Anonymization, Traffic Routing\n"
+    "More Projects: Visit https://github.com/sabbir28/AnonyNet for more details.\n"
+).encode()
+
+# Fixed responses, built once instead of on every request
+SERVER_INFO_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/plain\r\n"
+    b"Content-Length: " + str(len(SERVER_INFO)).encode() + b"\r\n"
+    b"\r\n" +
+    SERVER_INFO
+)
+CONNECTION_ESTABLISHED_RESPONSE = b"HTTP/1.1 200 Connection Established\r\n\r\n"
+BAD_REQUEST_RESPONSE = b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+HEADERS_TOO_LARGE_RESPONSE = (
+    b"HTTP/1.1 431 Request Header Fields Too Large\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+)
+
+# Request line of an HTTP request: method, request target and version
+REQUEST_LINE_RE = re.compile(rb'(\S+)[ \t]+(\S+)[ \t]+(\S+)\r?\n')
 
 # Global variables
 server_socket = None  # The main server socket
-client_threads = []  # List to keep track of all client threads
+client_pool = None  # Thread pool handling the client connections
+worker_processes = []  # Server processes started by start_workers()
+dns_cache = OrderedDict()  # Web server name -> (IPv4 address, expiry time), least recently used first
+dns_cache_lock = threading.Lock()  # Guards updates to dns_cache
+thread_buffers = threading.local()  # Receive buffer of each client handling thread
+
+def get_buffer():
+    """
+    Returns the receive buffer of the current thread.
+
+    Each thread handles one connection at a time, so the buffer is allocated
+    once and reused for every recv_into() instead of creating new bytes objects.
+
+    Returns:
+    --------
+    memoryview
+        A writable view of BUFFER_SIZE bytes.
+    """
+    buffer = getattr(thread_buffers, 'buffer', None)
+    if buffer is None:
+        buffer = thread_buffers.buffer = memoryview(bytearray(BUFFER_SIZE))
+    return buffer
+
+def resolve_host(webserver):
+    """
+    Resolves a web server name to an IPv4 address, reusing recent lookups.
+
+    Parameters:
+    -----------
+    webserver : bytes
+        The web server name (or IP address) taken from the request.
+
+    Returns:
+    --------
+    str
+        The IPv4 address to connect to.
+    """
+    now = time.monotonic()
+    cached = dns_cache.get(webserver)
+    if cached and cached[1] > now:
+        with dns_cache_lock:
+            if webserver in dns_cache:
+                dns_cache.move_to_end(webserver)  # Mark as most recently used
+        return cached[0]
+
+    address = socket.getaddrinfo(webserver, None, socket.AF_INET, socket.SOCK_STREAM)[0][4][0]
+
+    with dns_cache_lock:
+        dns_cache[webserver] = (address, now + DNS_CACHE_TTL)
+        dns_cache.move_to_end(webserver)  # A refreshed entry counts as just used too
+        if len(dns_cache) > DNS_CACHE_SIZE:
+            dns_cache.popitem(last=False)  # Drop the least recently used entry
+    return address
+
+def tune_socket(sock):
+    """
+    Sets the TCP options used on every client and web server connection.
+
+    Parameters:
+    -----------
+    sock : socket
+        A connected TCP socket.
+    """
+    # Send small writes (e.g. TLS handshake records) immediately instead of waiting on Nagle's algorithm
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+def read_request(client_socket):
+    """
+    Reads from the client until the end of the request headers has been received.
+
+    Parameters:
+    -----------
+    client_socket : socket
+        The socket connected to the client.
+
+    Returns:
+    --------
+    bytes or None
+        The data received so far: the headers and any body bytes that came with them.
+        Reading stops early if the client closes the connection. None if MAX_HEADER_SIZE
+        is reached before the end of the headers.
+
+    Raises:
+    -------
+    socket.timeout
+        If the headers haven't all arrived within CLIENT_TIMEOUT seconds.
+    """
+    # The timeout covers the whole header read, so trickling bytes in doesn't extend it
+    deadline = time.monotonic() + CLIENT_TIMEOUT
+
+    # Grown in place, so a request arriving in many small pieces isn't copied over and over
+    request = bytearray()
+    while len(request) < MAX_HEADER_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise socket.timeout("timed out reading request headers")
+        client_socket.settimeout(remaining)
+        data = client_socket.recv(MAX_HEADER_SIZE)
+        if not data:
+            return bytes(request)
+        request.extend(data)
+        # Only the newly received part (and a possibly split terminator) needs searching;
+        # lines may end in a bare LF, as REQUEST_LINE_RE allows
+        start = max(0, len(request) - len(data) - 3)
+        if request.find(b"\r\n\r\n", start) != -1 or request.find(b"\n\n", start) != -1:
+            return bytes(request)
+    return None
 
 def handle_client(client_socket):
     """
@@ -30,12 +189,23 @@ def handle_client(client_socket):
         The socket connected to the client.
     """
     try:
-        # Receive the client's request
-        request = client_socket.recv(BUFFER_SIZE)
+        tune_socket(client_socket)
+
+        # Receive the client's request; a client that stalls would otherwise hold a pool thread forever
+        request = read_request(client_socket)
+        if request is None:
+            client_socket.sendall(HEADERS_TOO_LARGE_RESPONSE)
+            return
+        if not request:
+            return  # The client closed the connection without sending anything
+        client_socket.settimeout(IDLE_TIMEOUT)
 
-        # Parse the request to extract the target address and port
-        first_line = request.split(b'\n')[0]  # Get the first line of the request (e.g., GET http://example.com)
-        url = first_line.split(b' ')[1]  # Extract the URL from the first line
+        # Parse the request line (e.g., GET http://example.com/ HTTP/1.1) to get the method and URL
+        match = REQUEST_LINE_RE.match(request)
+        if not match:
+            client_socket.sendall(BAD_REQUEST_RESPONSE)
+            return
+        method, url = match.group(1), match.group(2)
 
         # Check if the request is for the secret /info path
         if url == b"/info":
@@ -59,8 +229,8 @@ def handle_client(client_socket):
         webserver = ""
         port = -1
         if port_pos == -1 or webserver_pos < port_pos:
-            # Default to port 80 for HTTP or 443 for HTTPS if no port is specified
-            port = 80 if first_line.startswith(b"GET http") else 443
+            # Default to port 443 for HTTPS or 80 for HTTP if no port is specified
+            port = 443 if method == b"CONNECT" or url.startswith(b"https://") else 80
             webserver = temp[:webserver_pos]
         else:
             # Extract the port and web server name
@@ -68,7 +238,7 @@ def handle_client(client_socket):
             webserver = temp[:port_pos]
 
         # Handle HTTPS connections separately from HTTP
-        if first_line.startswith(b"CONNECT"):
+        if method == b"CONNECT":
             handle_https(client_socket, webserver, port)
         else:
             handle_http(client_socket, request, webserver, port)
@@ -88,30 +258,8 @@ def send_server_info(client_socket):
         The socket connected to the client.
     """
     try:
-        # Define the server details to be displayed
-        info = (
-            "AnonyNet Proxy Server\n"
-            "----------------------\n"
-            "Author: MD. SABBIR HOSHEN HOOWLADER\n"
-            "Website: https://sabbir28.github.io/\n"
-            "License: MIT License\n"
-            "Description: AnonyNet anonymizes user requests by routing them through random public proxies.\n"
-            "Server Name: AnonyNet\n"
-            "Functionalities: HTTP/HTTPS proxy, Anonymization, Traffic Routing\n"
-            "More Projects: Visit https://github.com/sabbir28/AnonyNet for more details.\n"
-        )
-
-        # Prepare the HTTP response
-        response = (
-            b"HTTP/1.1 200 OK\r\n"
-            b"Content-Type: text/plain\r\n"
-            b"Content-Length: " + str(len(info)).encode() + b"\r\n"
-            b"\r\n" +
-            info.encode()
-        )
-
         # Send the response to the client
-        client_socket.send(response)
+        client_socket.sendall(SERVER_INFO_RESPONSE)
     except Exception as e:
         print(f"Error sending server info: {e}")
 
@@ -133,18 +281,17 @@ def handle_http(client_socket, request, webserver, port):
     try:
         # Create a socket to connect to the web server
         proxy_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        proxy_socket.connect((webserver, port))
+        proxy_socket.settimeout(CONNECT_TIMEOUT)
+        proxy_socket.connect((resolve_host(webserver), port))
+        proxy_socket.settimeout(IDLE_TIMEOUT)
+        tune_socket(proxy_socket)
 
         # Send the HTTP request to the web server
-        proxy_socket.send(request)
+        proxy_socket.sendall(request)
 
-        # Continuously read data from the web server and send it back to the client
-        while True:
-            data = proxy_socket.recv(BUFFER_SIZE)
-            if len(data) > 0:
-                client_socket.send(data)  # Send the response data to the client
-            else:
-                break  # No more data from the web server
+        # Relay the rest of the request body (read_request only returns the first part of it)
+        # and send the response back to the client
+        tunnel(client_socket, proxy_socket)
     except Exception as e:
         print(f"Error handling HTTP request: {e}")
     finally:
@@ -152,6 +299,100 @@ def handle_http(client_socket, request, webserver, port):
         proxy_socket.close()
         client_socket.close()
 
+def open_splice_pipe():
+    """
+    Creates the pipe used to splice data between the two sockets of a tunnel.
+
+    Returns:
+    --------
+    tuple
+        The read end, the write end and the capacity of the pipe in bytes.
+    """
+    pipe_r, pipe_w = os.pipe2(os.O_CLOEXEC)
+    try:
+        # A bigger pipe moves more data per splice() call
+        size = fcntl.fcntl(pipe_w, fcntl.F_SETPIPE_SZ, PIPE_SIZE)
+    except OSError:
+        size = fcntl.fcntl(pipe_w, fcntl.F_GETPIPE_SZ)
+    return pipe_r, pipe_w, size
+
+def relay(src, dst, pipe):
+    """
+    Forwards the data currently available on one socket to the other.
+
+    Parameters:
+    -----------
+    src : socket
+        The socket that is ready to be read.
+    dst : socket
+        The socket the data is sent to.
+    pipe : tuple or None
+        The pipe from open_splice_pipe(), or None to copy the data through Python.
+
+    Returns:
+    --------
+    bool
+        False if src has been closed by its peer, True otherwise.
+    """
+    if pipe is None:
+        buffer = get_buffer()
+        received = src.recv_into(buffer)
+        if not received:
+            return False
+        dst.sendall(buffer[:received])
+        return True
+
+    pipe_r, pipe_w, size = pipe
+    # Move the data into the pipe and straight out to the other socket, all inside the kernel
+    pending = os.splice(src.fileno(), pipe_w, size, flags=os.SPLICE_F_MOVE)
+    if not pending:
+        return False
+    while pending:
+        try:
+            pending -= os.splice(pipe_r, dst.fileno(), pending, flags=os.SPLICE_F_MOVE)
+        except BlockingIOError:
+            # dst has a timeout and so is non-blocking; wait for its send buffer to drain
+            if not select.select([], [dst], [], IDLE_TIMEOUT)[1]:
+                raise socket.timeout("timed out sending tunnel data")
+    return True
+
+def tunnel(client_socket, proxy_socket):
+    """
+    Relays data in both directions between the client and the web server.
+
+    Runs until the web server closes the connection, either socket fails or neither
+    side sends anything for IDLE_TIMEOUT seconds. If the client finishes sending first,
+    the web server is told so and its reply is still relayed.
+
+    Parameters:
+    -----------
+    client_socket : socket
+        The socket connected to the client.
+    proxy_socket : socket
+        The socket connected to the web server.
+    """
+    pipe = open_splice_pipe() if USE_SPLICE else None
+    try:
+        # Add the client and proxy sockets to the list of readable connections
+        sockets = [client_socket, proxy_socket]
+        while True:
+            # Wait for data to be available on either socket
+            read_sockets, _, error_sockets = select.select(sockets, [], sockets, IDLE_TIMEOUT)
+            if error_sockets or not read_sockets:
+                return  # Exit if there is an error with any socket or the connection has gone idle
+            for sock in read_sockets:
+                other_sock = proxy_socket if sock is client_socket else client_socket
+                if not relay(sock, other_sock, pipe):
+                    if sock is proxy_socket:
+                        return  # The web server has closed the connection
+                    # The client is done sending; pass that on and wait for the rest of the reply
+                    sockets.remove(client_socket)
+                    proxy_socket.shutdown(socket.SHUT_WR)
+    finally:
+        if pipe:
+            os.close(pipe[0])
+            os.close(pipe[1])
+
 def handle_https(client_socket, webserver, port):
     """
     Handles HTTPS connections by tunneling data between the client and the web server.
@@ -168,25 +409,16 @@ def handle_https(client_socket, webserver, port):
     try:
         # Create a socket to connect to the web server
         proxy_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        proxy_socket.connect((webserver, port))
+        proxy_socket.settimeout(CONNECT_TIMEOUT)
+        proxy_socket.connect((resolve_host(webserver), port))
+        proxy_socket.settimeout(IDLE_TIMEOUT)
+        tune_socket(proxy_socket)
 
         # Send a 200 OK response to the client, indicating that the connection is established
-        client_socket.send(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+        client_socket.sendall(CONNECTION_ESTABLISHED_RESPONSE)
 
-        # Add the client and proxy sockets to the list of readable connections
-        sockets = [client_socket, proxy_socket]
-        while True:
-            # Wait for data to be available on either socket
-            read_sockets, _, error_sockets = select.select(sockets, [], sockets)
-            if error_sockets:
-                break  # Exit if there is an error with any socket
-            for sock in read_sockets:
-                other_sock = proxy_socket if sock == client_socket else client_socket
-                data = sock.recv(BUFFER_SIZE)
-                if data:
-                    other_sock.send(data)  # Send data to the other socket
-                else:
-                    break  # Exit if no data is received
+        # Pass the encrypted traffic through until the connection ends
+        tunnel(client_socket, proxy_socket)
     except Exception as e:
         print(f"Error handling HTTPS request: {e}")
     finally:
@@ -194,14 +426,25 @@ def handle_https(client_socket, webserver, port):
         proxy_socket.close()
         client_socket.close()
 
-def start_server():
+def start_server(reuse_port=False):
     """
     Starts the proxy server and listens for incoming client connections.
+
+    Parameters:
+    -----------
+    reuse_port : bool
+        Bind with SO_REUSEPORT so several server processes can listen on the same port.
     """
-    global server_socket
+    global server_socket, client_pool
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if reuse_port:
+        # The kernel spreads incoming connections across all sockets bound to the port
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
     server_socket.bind((LISTENING_ADDR, LISTENING_PORT))
-    server_socket.listen(5)  # Listen for up to 5 pending connections
+    server_socket.listen(socket.SOMAXCONN)
+
+    # Clients are handled by a fixed pool of threads instead of one new thread each
+    client_pool = ThreadPoolExecutor(max_workers=MAX_CLIENT_THREADS)
 
     print(f"[*] Listening on {LISTENING_ADDR}:{LISTENING_PORT}")
 
@@ -211,16 +454,53 @@ def start_server():
             client_socket, addr = server_socket.accept()
             print(f"[*] Accepted connection from {addr[0]}:{addr[1]}")
 
-            # Handle the client connection in a new thread
-            client_handler = threading.Thread(target=handle_client, args=(client_socket,))
-            client_handler.start()
-            client_threads.append(client_handler)
+            # Handle the client connection on the thread pool
+            client_pool.submit(handle_client, client_socket)
         except socket.error as e:
             print(f"Socket error: {e}")
         except Exception as e:
             print(f"Error accepting connections: {e}")
             break
 
+def run_worker(worker_id):
+    """
+    Entry point of a server process started by start_workers().
+
+    Parameters:
+    -----------
+    worker_id : int
+        Index of the worker, used to pick the CPU it is pinned to.
+    """
+    # The list was copied from the parent; this process has no workers of its own
+    worker_processes.clear()
+
+    # Pin the worker to one CPU so its connections stay cache-local
+    if hasattr(os, 'sched_setaffinity'):
+        cpus = sorted(os.sched_getaffinity(0))
+        try:
+            os.sched_setaffinity(0, {cpus[worker_id % len(cpus)]})
+        except OSError:
+            pass
+
+    start_server(reuse_port=True)
+
+def start_workers(count):
+    """
+    Starts several server processes that share the listening port and waits for them.
+
+    Parameters:
+    -----------
+    count : int
+        Number of server processes to start.
+    """
+    for worker_id in range(count):
+        process = multiprocessing.Process(target=run_worker, args=(worker_id,))
+        process.start()
+        worker_processes.append(process)
+
+    for process in worker_processes:
+        process.join()
+
 def signal_handler(sig, frame):
     """
     Handles shutdown signals (e.g., Ctrl+C) and gracefully shuts down the server.
@@ -235,11 +515,16 @@ def signal_handler(sig, frame):
     print("\n[!] Shutting down the server...")
     if server_socket:
         server_socket.close()  # Close the server socket
-    for t in client_threads:
-        t.join()  # Wait for all client threads to finish
+    if client_pool:
+        client_pool.shutdown(wait=True)  # Wait for all client connections to finish
+    for process in worker_processes:
+        process.join()  # Wait for all server processes to finish
     sys.exit(0)  # Exit the program
 
 if __name__ == "__main__":
     # Set up signal handling to gracefully shut down the server on SIGINT (Ctrl+C)
     signal.signal(signal.SIGINT, signal_handler)
-    start_server()
+    if WORKER_PROCESSES > 1 and hasattr(socket, 'SO_REUSEPORT'):
+        start_workers(WORKER_PROCESSES)
+    else:
+        start_server()